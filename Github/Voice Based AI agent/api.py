@@ -1,13 +1,21 @@
 from fastapi import FastAPI, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from voice_agent import VoiceAIAgent
-import tempfile
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from voice_agent import AudioDecodeError, VoiceAIAgent, close_openai_http_client, decode_audio
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import logging
+import numpy as np
+import torch
+import orjson
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Union
 
-app = FastAPI(title="Healthcare Voice AI Agent API")
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Healthcare Voice AI Agent API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,7 +27,74 @@ app.add_middleware(
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-agent = VoiceAIAgent()
+# Hashing, decoding and Whisper transcription are blocking, so they run on a worker
+# pool instead of the event loop. Whisper calls themselves are serialized inside the
+# agent because the shared model is not safe to run from several threads at once.
+executor = ThreadPoolExecutor(max_workers=int(os.getenv("AGENT_WORKERS", "4")))
+
+agent = VoiceAIAgent(executor=executor)
+
+# Whisper loads on the first request by default. Set PRELOAD_WHISPER=1 to load it
+# at import instead, so `gunicorn --preload` shares the weights with forked CPU workers
+# and, on a GPU, the first request does not pay for kernel warm-up.
+if os.getenv("PRELOAD_WHISPER") == "1":
+    agent.warm_up()
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+@app.on_event("shutdown")
+async def close_clients():
+    """Release the cache and OpenAI connections when the server shuts down"""
+    await agent.aclose()
+    await close_openai_http_client()
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    """Stop the worker pool when the server shuts down"""
+    executor.shutdown(wait=True)
+
+async def hash_upload(audio_file: UploadFile) -> str:
+    """
+    Hash an upload without decoding it, then rewind it.
+    
+    Args:
+        audio_file (UploadFile): The uploaded audio file
+        
+    Returns:
+        str: SHA-256 of the uploaded bytes
+    """
+    digest = hashlib.sha256()
+    while chunk := await audio_file.read(UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+    await audio_file.seek(0)
+    return digest.hexdigest()
+
+async def decode_upload(audio_file: UploadFile) -> Union[np.ndarray, torch.Tensor]:
+    """
+    Decode an upload in memory.
+    
+    The upload is decoded in-process with torchaudio and resampled on the model's device;
+    formats torchaudio cannot read are streamed through ffmpeg one chunk at a time instead.
+    
+    Args:
+        audio_file (UploadFile): The uploaded audio file
+        
+    Returns:
+        The 16 kHz mono waveform
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        audio = await loop.run_in_executor(executor, agent.load_audio, audio_file.file)
+    except AudioDecodeError as e:
+        logger.warning(f"torchaudio could not decode {audio_file.filename}, falling back to ffmpeg: {str(e)}")
+        await audio_file.seek(0)
+
+        async def chunks():
+            while chunk := await audio_file.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+        audio = await decode_audio(chunks())
+    return audio
 
 @app.get("/")
 async def read_root():
@@ -38,22 +113,54 @@ async def process_audio(audio_file: UploadFile = File(...)):
         Dict containing transcript, language, intent, response, and confidence score
     """
     try:
-        # Create a temporary file to store the uploaded audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio_file.filename)[1]) as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
-            temp_file.flush()
+        # Repeated uploads are answered from the cache before anything is decoded
+        audio_digest = await hash_upload(audio_file)
+        cached = await agent.cached_result(audio_digest)
+        if cached is not None:
+            return cached
 
-            result = agent.process_audio(temp_file.name)
-            
-            # Clean up the temporary file
-            os.unlink(temp_file.name)
-            
-            return result
+        audio = await decode_upload(audio_file)
+        result = await agent.process_audio(audio, audio_digest=audio_digest)
+        
+        return result
             
     except Exception as e:
         return {"error": str(e)}
 
+@app.post("/process-audio/stream/")
+async def process_audio_stream(audio_file: UploadFile = File(...)):
+    """
+    Process an audio file and stream the result as newline-delimited JSON.
+    
+    The first line holds transcript, language, intent, and confidence score; each
+    following line holds the next "response" piece as the model generates it.
+    
+    Args:
+        audio_file (UploadFile): The audio file to process
+        
+    Returns:
+        StreamingResponse of JSON lines
+    """
+    try:
+        audio_digest = await hash_upload(audio_file)
+        cached = await agent.cached_result(audio_digest)
+        audio = await decode_upload(audio_file) if cached is None else None
+    except Exception as e:
+        return {"error": str(e)}
+
+    async def events():
+        try:
+            if cached is not None:
+                for event in agent.stream_events(cached):
+                    yield orjson.dumps(event) + b"\n"
+                return
+            async for event in agent.process_audio_stream(audio, audio_digest=audio_digest):
+                yield orjson.dumps(event) + b"\n"
+        except Exception as e:
+            yield orjson.dumps({"error": str(e)}) + b"\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, List, Optional
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        executor: Optional[Executor] = None,
+        max_batch_size: int = 8,
+        max_wait: float = 0.05
+    ):
+        """
+        Initialize a batcher that groups concurrent calls into one blocking batch call.
+
+        Only one batch runs at a time; items submitted while it runs wait for the next
+        batch, so a busy batch function naturally collects larger batches.
+
+        Args:
+            batch_fn (Callable): Blocking function mapping a list of items to a list of results.
+                A result that is an Exception is raised to the caller of that item only.
+            executor (Executor, optional): Pool the batch function runs on
+            max_batch_size (int): Maximum number of items per batch
+            max_wait (float): Seconds to wait for more items before running a partial batch
+        """
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        self._running = None
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item for the next batch and wait for its result.
+
+        Args:
+            item: Input passed to the batch function
+
+        Returns:
+            The batch function's result for this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        # While a batch is running, new items simply queue; it flushes them when done
+        if self._running is None:
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._running is not None or not self._pending:
+            return
+
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._running = asyncio.ensure_future(self._run(batch))
+        self._running.add_done_callback(self._batch_done)
+
+    def _batch_done(self, _task: asyncio.Future) -> None:
+        self._running = None
+        # Items queued during the last batch have already waited; run them right away
+        self._flush()
+
+    async def _run(self, batch: List[Any]) -> None:
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+        try:
+            results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
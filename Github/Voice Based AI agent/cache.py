@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(*parts: str) -> str:
+    """
+    Build a SHA-256 cache key from one or more string parts.
+
+    Args:
+        *parts (str): Values identifying the cached computation
+
+    Returns:
+        str: Hex digest of the joined parts
+    """
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 digest of a file's contents.
+
+    Args:
+        path (str): Path to the file
+        chunk_size (int): Number of bytes read per iteration
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, ttl: float = 86400, max_entries: int = 1024):
+        """
+        Initialize an in-memory LRU cache whose entries expire after a TTL.
+
+        Args:
+            ttl (float): Seconds an entry stays valid
+            max_entries (int): Maximum number of entries kept before evicting the oldest
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if it is missing or expired.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            The cached value or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store value under key.
+
+        Args:
+            key (str): Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def aclose(self) -> None:
+        """Release resources; the in-memory cache holds none."""
+
+
+class RedisResponseCache:
+    def __init__(self, url: str, ttl: float = 86400, prefix: str = "voice_agent:"):
+        """
+        Initialize a Redis-backed cache shared by every worker and kept across restarts.
+
+        Args:
+            url (str): Redis connection URL, e.g. redis://localhost:6379/0
+            ttl (float): Seconds an entry stays valid
+            prefix (str): Namespace prepended to every key
+        """
+        self.ttl = ttl
+        self.prefix = prefix
+        self.client = aioredis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if it is missing, expired, undecodable, or Redis is unreachable.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            The cached value or None
+        """
+        try:
+            cached = await self.client.get(self.prefix + key)
+        except RedisError as e:
+            logger.warning(f"Cache read failed: {str(e)}")
+            return None
+        if cached is None:
+            return None
+        try:
+            return orjson.loads(cached)
+        except orjson.JSONDecodeError as e:
+            # A corrupt or foreign value is treated as a miss and overwritten on the next set
+            logger.warning(f"Ignoring undecodable cache entry {key}: {str(e)}")
+            return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store value under key; failures are logged and otherwise ignored.
+
+        Args:
+            key (str): Cache key
+            value: JSON-serializable value to cache
+        """
+        try:
+            await self.client.set(self.prefix + key, orjson.dumps(value), ex=int(self.ttl))
+        except RedisError as e:
+            logger.warning(f"Cache write failed: {str(e)}")
+
+    async def aclose(self) -> None:
+        """Close the connection pool to Redis."""
+        await self.client.aclose()
+
+
+def create_cache():
+    """
+    Build the response cache configured by the environment.
+
+    Uses Redis when REDIS_URL is set so all workers share one cache, and an
+    in-memory cache per process otherwise.
+
+    Returns:
+        RedisResponseCache or ResponseCache
+    """
+    ttl = float(os.getenv("CACHE_TTL_SECONDS", "86400"))
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        return RedisResponseCache(redis_url, ttl=ttl)
+    return ResponseCache(ttl=ttl, max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")))
@@ -1,8 +1,10 @@
 import os
+import io
 from gtts import gTTS
 from pydub import AudioSegment
-import json
+import orjson
 import random
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 import logging
 
@@ -10,10 +12,11 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DatasetGenerator:
-    def __init__(self, output_dir: str = "test_data"):
+    def __init__(self, output_dir: str = "test_data", max_workers: int = 8):
         """Initialize the dataset generator."""
         self.output_dir = output_dir
         self.sample_rate = 16000
+        self.max_workers = max_workers
         
         os.makedirs(output_dir, exist_ok=True)
         self.scenarios = {
@@ -114,17 +117,20 @@ class DatasetGenerator:
         try:
             tts = gTTS(text=text, lang=language, slow=False)
             
-            output_path = os.path.join(self.output_dir, filename)
-            tts.save(output_path)
+            # Keep the MP3 in memory and write only the final WAV to disk
+            mp3_buffer = io.BytesIO()
+            tts.write_to_fp(mp3_buffer)
+            mp3_buffer.seek(0)
             
-            audio = AudioSegment.from_mp3(output_path)
-            audio = audio.set_frame_rate(self.sample_rate)
-            audio.export(output_path.replace('.mp3', '.wav'), format='wav')
+            output_path = os.path.join(self.output_dir, os.path.splitext(filename)[0] + '.wav')
+            audio = AudioSegment.from_file(mp3_buffer, format='mp3')
+            audio = audio.set_frame_rate(self.sample_rate).set_channels(1)
+            audio.export(output_path, format='wav')
             
-            return output_path.replace('.mp3', '.wav')
+            return output_path
             
         except Exception as e:
-            logger.error(f"Error generating audio for {filename}: {str(e)}")
+            logger.error("Error generating audio for %s: %s", filename, e)
             raise
 
     def generate_dataset(self, samples_per_intent: int = 5) -> Dict:
@@ -147,36 +153,47 @@ class DatasetGenerator:
         }
         
         try:
+            jobs = []
             for intent, languages in self.scenarios.items():
                 for lang, texts in languages.items():
                     selected_texts = random.sample(texts, min(samples_per_intent, len(texts)))
                     
                     for i, text in enumerate(selected_texts):
-                        filename = f"{intent}_{lang}_{i+1}.wav"
-                        audio_path = self.generate_audio(text, lang, filename)
-                        
-                        sample = {
-                            "filename": filename,
-                            "text": text,
-                            "language": lang,
-                            "intent": intent,
-                            "path": audio_path
-                        }
-                        
-                        dataset["samples"].append(sample)
-                        dataset["metadata"]["total_samples"] += 1
-                        
-                        logger.info(f"Generated {filename}")
+                        jobs.append((intent, lang, f"{intent}_{lang}_{i+1}.wav", text))
+            
+            # Each sample is an independent gTTS request, so they run concurrently;
+            # results are collected in submission order to keep the metadata stable
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self.generate_audio, text, lang, filename)
+                    for _, lang, filename, text in jobs
+                ]
+                
+                dataset["samples"] = [
+                    {
+                        "filename": filename,
+                        "text": text,
+                        "language": lang,
+                        "intent": intent,
+                        "path": future.result()
+                    }
+                    for (intent, lang, filename, text), future in zip(jobs, futures)
+                ]
+            dataset["metadata"]["total_samples"] = len(jobs)
+            
+            # One summary line instead of a locked logging call per sample
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Generated %d files: %s", len(jobs), ", ".join(filename for _, _, filename, _ in jobs))
             
             metadata_path = os.path.join(self.output_dir, "dataset_metadata.json")
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(dataset, f, ensure_ascii=False, indent=2)
+            with open(metadata_path, 'wb') as f:
+                f.write(orjson.dumps(dataset, option=orjson.OPT_INDENT_2))
             
-            logger.info(f"Dataset generation complete. Total samples: {dataset['metadata']['total_samples']}")
+            logger.info("Dataset generation complete. Total samples: %d", dataset["metadata"]["total_samples"])
             return dataset
             
         except Exception as e:
-            logger.error(f"Error generating dataset: {str(e)}")
+            logger.error("Error generating dataset: %s", e)
             raise
 
 if __name__ == "__main__":
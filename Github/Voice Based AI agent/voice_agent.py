@@ -1,27 +1,153 @@
 import os
-import json
+import re
+import asyncio
+import collections
+import functools
+import hashlib
+import math
+import httpx
+import threading
+import numpy as np
+import orjson
+import torch
+import torchaudio
 import whisper
-from langdetect import detect
-from openai import OpenAI
-from typing import Dict, Any
+from concurrent.futures import Executor
+from openai import AsyncOpenAI
+from typing import Dict, Any, AsyncIterator, BinaryIO, List, Optional, Union
 import logging
 from dotenv import load_dotenv
+from batching import MicroBatcher
+from cache import cache_key, create_cache, file_digest
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class AudioDecodeError(RuntimeError):
+    """Raised when torchaudio cannot decode an audio source."""
+
+# A path to an audio file, or a 16 kHz mono waveform
+AudioInput = Union[str, np.ndarray, torch.Tensor]
+
+# Shared by every agent in the process: HTTP/2 multiplexes concurrent OpenAI calls over
+# one keep-alive connection, and connect errors are retried at the transport level.
+# Limits live on the transport because httpx ignores client-level limits when one is given.
+_openai_http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(30.0, connect=10.0),
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128)
+    )
+)
+
+_whisper_lock = threading.Lock()
+
+# openai-whisper installs kv-cache forward hooks on the shared decoder for every decode,
+# so two concurrent transcribe/decode calls on one model corrupt each other's state.
+# Every inference call on the model must hold this lock.
+_whisper_inference_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def _load_whisper_model(name: str, device: str):
+    logger.info(f"Loading Whisper {name} model on {device}")
+    return whisper.load_model(name, device=device)
+
+async def close_openai_http_client() -> None:
+    """Close the shared OpenAI HTTP client and its keep-alive connections."""
+    await _openai_http_client.aclose()
+
+def get_whisper_model(name: str = "base", device: str = "cpu"):
+    """
+    Return the process-wide Whisper model, loading it on first use.
+    
+    Args:
+        name (str): Whisper model size
+        device (str): Device to load the model onto
+        
+    Returns:
+        The loaded Whisper model
+    """
+    # The lock keeps concurrent first requests from loading the weights twice
+    with _whisper_lock:
+        return _load_whisper_model(name, device)
+
+async def decode_audio(chunks: AsyncIterator[bytes], sample_rate: int = whisper.audio.SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode encoded audio to a mono float32 waveform by piping it through ffmpeg.
+    
+    Args:
+        chunks (AsyncIterator[bytes]): Encoded audio bytes, e.g. read from an upload
+        sample_rate (int): Output sample rate
+        
+    Returns:
+        np.ndarray: Waveform scaled to [-1, 1]
+    """
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-threads", "0", "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+    async def feed():
+        try:
+            async for chunk in chunks:
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg gave up on the input; its exit code and stderr report why
+            pass
+        finally:
+            process.stdin.close()
+
+    # Output has to be drained while input is fed, or ffmpeg blocks on a full pipe
+    _, stdout, stderr = await asyncio.gather(feed(), process.stdout.read(), process.stderr.read())
+    if await process.wait() != 0:
+        raise RuntimeError(f"Failed to decode audio: {stderr.decode(errors='replace').strip()}")
+
+    return np.frombuffer(stdout, np.int16).astype(np.float32) / 32768.0
+
 class VoiceAIAgent:
-    def __init__(self):
-        """Initialize the Voice AI Agent with necessary models and configurations."""
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        min_keyword_margin: int = 2,
+        max_batch_size: int = 8,
+        max_batch_wait: float = 0.05
+    ):
+        """
+        Initialize the Voice AI Agent with necessary models and configurations.
+        
+        Args:
+            executor (Executor, optional): Pool used for blocking Whisper work. Defaults to the event loop's default executor.
+            min_keyword_margin (int): Keyword hits the winning intent must lead the runner-up by to skip the LLM intent classifier
+            max_batch_size (int): Maximum number of concurrent uploads transcribed in one Whisper pass
+            max_batch_wait (float): Seconds to wait for more uploads before transcribing a partial batch
+        """
         # Check if API key is set
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set. Please set it in your .env file.")
             
-        self.whisper_model = whisper.load_model("base")
-        self.openai_client = OpenAI(api_key=api_key)
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        if self.device == "cuda":
+            # Batched clips are always padded to one 30-second mel shape, so cuDNN
+            # can autotune once per batch size and reuse the fastest kernels
+            torch.backends.cudnn.benchmark = True
+        self.whisper_model_name = "base"
+        self.openai_client = AsyncOpenAI(api_key=api_key, http_client=_openai_http_client)
+        self.executor = executor
+        self.batcher = MicroBatcher(
+            self.transcribe_batch,
+            executor=executor,
+            max_batch_size=max_batch_size,
+            max_wait=max_batch_wait
+        )
+        self.cache = create_cache()
         
         self.language_map = {
             'en': 'English',
@@ -40,35 +166,183 @@ class VoiceAIAgent:
             "billing_inquiry": ["factura", "pago", "costo", "billing", "payment", "cost"],
             "general_inquiry": ["información", "pregunta", "duda", "information", "question"]
         }
+        # All keywords compiled into one alternation so matching is a single C-level pass
+        self.keyword_intents = {
+            keyword.lower(): intent
+            for intent, keywords in self.intent_keywords.items()
+            for keyword in keywords
+        }
+        self.keyword_pattern = re.compile(
+            r"\b(?:" + "|".join(map(re.escape, sorted(self.keyword_intents, key=len, reverse=True))) + r")\b"
+        )
+        self.min_keyword_margin = min_keyword_margin
+        # Static, so every classification request shares the same prompt prefix
+        self.intent_system_prompt = (
+            "You are a healthcare intent classification expert. "
+            "Classify the user's message as exactly one of: " + ", ".join(self.intent_keywords) + ". "
+            'Reply with a JSON object: {"intent": "<intent>", "confidence_score": <number between 0 and 1>}.'
+        )
+
+    @property
+    def whisper_model(self):
+        """The Whisper model, loaded lazily so idle workers never allocate it."""
+        return get_whisper_model(self.whisper_model_name, self.device)
+
+    def warm_up(self) -> None:
+        """
+        Load the Whisper model now instead of on the first request.
+        
+        On CUDA this also decodes silent clips at the smallest and largest batch sizes,
+        so kernel selection and autotuning happen before real traffic arrives.
+        """
+        get_whisper_model(self.whisper_model_name, self.device)
+        if self.device == "cuda":
+            silence = np.zeros(whisper.audio.N_SAMPLES, dtype=np.float32)
+            for batch_size in sorted({1, self.batcher.max_batch_size}):
+                self._decode_batch([silence] * batch_size)
+
+    def load_audio(self, source: Union[str, BinaryIO]) -> torch.Tensor:
+        """
+        Decode audio in-process with torchaudio and resample it to 16 kHz mono on the model's device.
+        
+        Args:
+            source (str or BinaryIO): Path to the audio file or a readable file object
+            
+        Returns:
+            torch.Tensor: 1-D float32 waveform on self.device
+            
+        Raises:
+            AudioDecodeError: If torchaudio's backends cannot read the source
+        """
+        # Only decode failures are wrapped; device and resampling errors such as
+        # CUDA OOM propagate instead of being retried through another decoder
+        try:
+            waveform, sample_rate = torchaudio.load(source)
+        except (RuntimeError, OSError, ValueError) as e:
+            raise AudioDecodeError(str(e)) from e
+        waveform = waveform.to(self.device)
+        if sample_rate != whisper.audio.SAMPLE_RATE:
+            waveform = torchaudio.functional.resample(waveform, sample_rate, whisper.audio.SAMPLE_RATE)
+        return waveform.mean(dim=0)
+
+    def _load_audio_file(self, audio_path: str) -> AudioInput:
+        try:
+            return self.load_audio(audio_path)
+        except AudioDecodeError as e:
+            # Formats torchaudio's backends cannot read still go through Whisper's ffmpeg loader
+            logger.warning(f"torchaudio could not decode {audio_path}, falling back to ffmpeg: {str(e)}")
+            return whisper.load_audio(audio_path)
+
+    def _decode_batch(self, audios: List[Union[np.ndarray, torch.Tensor]]) -> List[Any]:
+        # Pad or trim every clip to exactly 30 seconds so the encoder always sees the same shape;
+        # spectrograms are computed on the model's device whether the clip arrived as an array or tensor
+        model = self.whisper_model
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels, device=model.device)
+            for audio in audios
+        ])
+        options = whisper.DecodingOptions(fp16=self.device == "cuda", without_timestamps=True)
+        with _whisper_inference_lock:
+            return whisper.decode(model, mel, options)
+
+    def _transcription_result(self, transcript: str, detected_lang: str) -> Dict[str, Any]:
+        # Whisper reports the spoken language as an ISO 639-1 code
+        language_name = self.language_map.get(detected_lang, detected_lang)
+        
+        return {
+            "transcript": transcript,
+            "language": language_name
+        }
 
-    def transcribe_audio(self, audio_path: str) -> Dict[str, Any]:
+    def transcribe_audio(self, audio: AudioInput) -> Dict[str, Any]:
         """
         Transcribe audio file and detect language.
         
         Args:
-            audio_path (str): Path to the audio file
+            audio (str, np.ndarray or torch.Tensor): Path to the audio file, or a 16 kHz mono waveform
             
         Returns:
             Dict containing transcript and detected language
         """
         try:
             # Transcribe audio
-            result = self.whisper_model.transcribe(audio_path)
-            transcript = result["text"]
-            
-            # Detect language
-            detected_lang = detect(transcript)
-            language_name = self.language_map.get(detected_lang, detected_lang)
-            
-            return {
-                "transcript": transcript,
-                "language": language_name
-            }
+            model = self.whisper_model
+            with _whisper_inference_lock:
+                result = model.transcribe(audio, fp16=self.device == "cuda")
+            return self._transcription_result(result["text"], result["language"])
         except Exception as e:
             logger.error(f"Error in transcription: {str(e)}")
             raise
 
-    def classify_intent(self, transcript: str) -> Dict[str, Any]:
+    def transcribe_batch(self, audios: List[AudioInput]) -> List[Any]:
+        """
+        Transcribe several audio clips, decoding all clips of up to 30 seconds in one batched forward pass.
+        
+        Args:
+            audios (List[str, np.ndarray or torch.Tensor]): Paths to audio files or 16 kHz mono waveforms
+            
+        Returns:
+            List with a transcription dict per clip, or the exception raised while loading that clip
+        """
+        results = [None] * len(audios)
+        short_clips = []
+        for i, audio in enumerate(audios):
+            if isinstance(audio, str):
+                try:
+                    audio = self._load_audio_file(audio)
+                except Exception as e:
+                    logger.error(f"Error loading {audios[i]}: {str(e)}")
+                    results[i] = e
+                    continue
+            
+            # Whisper decodes one 30-second window at a time; longer clips need the full transcribe loop
+            if len(audio) > whisper.audio.N_SAMPLES:
+                try:
+                    results[i] = self.transcribe_audio(audio)
+                except Exception as e:
+                    results[i] = e
+            else:
+                short_clips.append((i, audio))
+        
+        if short_clips:
+            try:
+                decoded = self._decode_batch([audio for _, audio in short_clips])
+                
+                for (i, _), decoding in zip(short_clips, decoded):
+                    results[i] = self._transcription_result(decoding.text, decoding.language)
+            except Exception as e:
+                logger.error(f"Error in batched transcription: {str(e)}")
+                for i, _ in short_clips:
+                    results[i] = e
+        
+        return results
+
+    def keyword_intent(self, transcript: str) -> Dict[str, Any]:
+        """
+        Classify the intent locally by counting keyword hits per intent.
+        
+        Args:
+            transcript (str): The transcribed text
+            
+        Returns:
+            Dict containing intent, confidence score (the share of the winning intent's
+            keywords that matched, 0 when nothing matches), and margin (distinct keywords
+            matched for the winning intent minus those matched for the runner-up)
+        """
+        # Count distinct keywords so repeating one word cannot build up a margin
+        matched = {match.group() for match in self.keyword_pattern.finditer(transcript.lower())}
+        hits = collections.Counter(self.keyword_intents[keyword] for keyword in matched)
+        if not hits:
+            return {"intent": "general_inquiry", "confidence_score": 0.0, "margin": 0}
+        ranked = hits.most_common(2) + [(None, 0)]
+        (best, count), (_, runner_up) = ranked[0], ranked[1]
+        return {
+            "intent": best,
+            "confidence_score": min(count / len(self.intent_keywords[best]), 1.0),
+            "margin": count - runner_up
+        }
+
+    async def classify_intent(self, transcript: str) -> Dict[str, Any]:
         """
         Classify the intent of the transcript.
         
@@ -78,33 +352,53 @@ class VoiceAIAgent:
         Returns:
             Dict containing intent and confidence score
         """
+        # Only a clear lead of several keyword hits skips the LLM call;
+        # a single substring match is too easily a false positive
+        local_result = self.keyword_intent(transcript)
+        if local_result["margin"] >= self.min_keyword_margin:
+            return {"intent": local_result["intent"], "confidence_score": local_result["confidence_score"]}
+
+        key = "intent:" + cache_key(" ".join(transcript.lower().split()))
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
         try:
-            prompt = f"""
-            Analyze the following healthcare-related message and classify its intent.
-            Choose from: appointment_scheduling, insurance_coverage_inquiry, prescription_refill, billing_inquiry, general_inquiry
-            
-            Message: {transcript}
-            
-            Return a JSON with 'intent' and 'confidence_score' (0-1).
-            """
-            
-            response = self.openai_client.chat.completions.create(
+            response = await self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
-                    {"role": "system", "content": "You are a healthcare intent classification expert."},
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": self.intent_system_prompt},
+                    {"role": "user", "content": transcript}
                 ],
+                response_format={"type": "json_object"},
                 temperature=0.3
             )
             
-            result = json.loads(response.choices[0].message.content)
-            return result
+            # JSON mode guarantees valid JSON but not its fields, so normalize them
+            content = orjson.loads(response.choices[0].message.content)
+            if not isinstance(content, dict):
+                content = {}
+            intent = content.get("intent")
+            if intent not in self.intent_keywords:
+                intent = "general_inquiry"
+            try:
+                confidence_score = float(content.get("confidence_score", 0.0))
+            except (TypeError, ValueError):
+                confidence_score = 0.0
+            if not math.isfinite(confidence_score):
+                confidence_score = 0.0
+            result = {
+                "intent": intent,
+                "confidence_score": min(max(confidence_score, 0.0), 1.0)
+            }
+            await self.cache.set(key, result)
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Error in intent classification: {str(e)}")
             raise
 
-    def generate_response(self, transcript: str, intent: str, language: str) -> str:
+    async def generate_response(self, transcript: str, intent: str, language: str) -> str:
         """
         Generate an appropriate response based on the intent and language.
         
@@ -116,63 +410,265 @@ class VoiceAIAgent:
         Returns:
             str: Generated response
         """
+        key = "response:" + cache_key(transcript.strip(), intent, language)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            prompt = f"""
-            Generate a professional healthcare response in {language} for the following:
+            response = await self.openai_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=self._response_messages(transcript, intent, language),
+                temperature=0.7
+            )
+
+            response_text = self._strip_response_prefix(response.choices[0].message.content).strip()
             
-            Original message: {transcript}
-            Intent: {intent}
+            await self.cache.set(key, response_text)
+            return response_text
             
-            The response should be helpful, concise, and maintain patient privacy.
-            Return ONLY the response text without any prefixes or additional formatting.
-            """
+        except Exception as e:
+            logger.error(f"Error in response generation: {str(e)}")
+            raise
+
+    async def stream_response(self, transcript: str, intent: str, language: str) -> AsyncIterator[str]:
+        """
+        Generate the response like generate_response, yielding text as the model produces it.
+        
+        Args:
+            transcript (str): The original transcript
+            intent (str): The classified intent
+            language (str): The detected language
             
-            response = self.openai_client.chat.completions.create(
+        Yields:
+            str: Consecutive pieces of the generated response
+        """
+        key = "response:" + cache_key(transcript.strip(), intent, language)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        try:
+            stream = await self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a professional healthcare assistant. Return only the response text without any prefixes or additional formatting."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
+                messages=self._response_messages(transcript, intent, language),
+                temperature=0.7,
+                stream=True
             )
 
-            response_text = response.choices[0].message.content.strip()
-            if response_text.lower().startswith("response:"):
-                response_text = response_text[9:].strip()
+            # Hold back the first few characters until a "Response:" prefix can be ruled out
+            head = ""
+            parts = []
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not parts and len(head.lstrip()) < len("response:"):
+                    head += delta
+                    if len(head.lstrip()) < len("response:"):
+                        continue
+                    delta = self._strip_response_prefix(head)
+                    if not delta:
+                        continue
+                parts.append(delta)
+                yield delta
             
-            return response_text
+            if not parts and head.strip():
+                parts.append(self._strip_response_prefix(head))
+                yield parts[0]
+            
+            await self.cache.set(key, "".join(parts).strip())
             
         except Exception as e:
             logger.error(f"Error in response generation: {str(e)}")
             raise
 
-    def process_audio(self, audio_path: str) -> Dict[str, Any]:
+    def _response_messages(self, transcript: str, intent: str, language: str) -> List[Dict[str, str]]:
+        prompt = f"""
+        Generate a professional healthcare response in {language} for the following:
+        
+        Original message: {transcript}
+        Intent: {intent}
+        
+        The response should be helpful, concise, and maintain patient privacy.
+        Return ONLY the response text without any prefixes or additional formatting.
+        """
+        
+        return [
+            {"role": "system", "content": "You are a professional healthcare assistant. Return only the response text without any prefixes or additional formatting."},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def _strip_response_prefix(text: str) -> str:
+        text = text.lstrip()
+        if text.lower().startswith("response:"):
+            text = text[9:].lstrip()
+        return text
+
+    async def process_audio(self, audio: AudioInput, audio_digest: Optional[str] = None) -> Dict[str, Any]:
         """
         Process audio file end-to-end and return structured response.
         
         Args:
-            audio_path (str): Path to the audio file
+            audio (str, np.ndarray or torch.Tensor): Path to the audio file, or a 16 kHz mono waveform
+            audio_digest (str, optional): SHA-256 of the encoded audio, used as the cache key
             
         Returns:
             Dict containing all processing results
         """
         try:
-            transcription_result = self.transcribe_audio(audio_path)
-            intent_result = self.classify_intent(transcription_result["transcript"])
-            
-            response = self.generate_response(
-                transcription_result["transcript"],
-                intent_result["intent"],
-                transcription_result["language"]
-            )
+            # Identical audio skips the whole pipeline
+            audio_digest = await self._audio_digest(audio, audio_digest)
+            key = "pipeline:" + audio_digest
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+            transcription_result = await self._transcribe(audio, audio_digest)
+            transcript = transcription_result["transcript"]
+            language = transcription_result["language"]
+
+            # When keywords point to a single intent, generate its response while the
+            # LLM classifies and only regenerate if the two disagree. With no hits or a
+            # tie the guess is unreliable, so wait for the classification instead.
+            guess = self.keyword_intent(transcript)
+            if guess["margin"] > 0:
+                intent_result, response = await asyncio.gather(
+                    self.classify_intent(transcript),
+                    self.generate_response(transcript, guess["intent"], language)
+                )
+                if intent_result["intent"] != guess["intent"]:
+                    response = await self.generate_response(transcript, intent_result["intent"], language)
+            else:
+                intent_result = await self.classify_intent(transcript)
+                response = await self.generate_response(transcript, intent_result["intent"], language)
             
-            return {
-                "transcript": transcription_result["transcript"],
-                "language": transcription_result["language"],
+            result = {
+                "transcript": transcript,
+                "language": language,
                 "intent": intent_result["intent"],
                 "response": response,
                 "confidence_score": intent_result["confidence_score"]
             }
+            await self.cache.set(key, result)
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Error in processing audio: {str(e)}")
+            raise
+
+    async def process_audio_stream(
+        self,
+        audio: AudioInput,
+        audio_digest: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process audio file end-to-end, streaming the response text as it is generated.
+        
+        Args:
+            audio (str, np.ndarray or torch.Tensor): Path to the audio file, or a 16 kHz mono waveform
+            audio_digest (str, optional): SHA-256 of the encoded audio, used as the cache key
+            
+        Yields:
+            Dict with transcript, language, intent and confidence score first, then
+            dicts holding consecutive "response" pieces
+        """
+        try:
+            audio_digest = await self._audio_digest(audio, audio_digest)
+            key = "pipeline:" + audio_digest
+            cached = await self.cache.get(key)
+            if cached is not None:
+                for event in self.stream_events(cached):
+                    yield event
+                return
+
+            transcription_result = await self._transcribe(audio, audio_digest)
+            transcript = transcription_result["transcript"]
+            language = transcription_result["language"]
+            intent_result = await self.classify_intent(transcript)
+
+            result = {
+                "transcript": transcript,
+                "language": language,
+                "intent": intent_result["intent"],
+                "confidence_score": intent_result["confidence_score"]
+            }
+            yield dict(result)
+
+            parts = []
+            async for delta in self.stream_response(transcript, intent_result["intent"], language):
+                parts.append(delta)
+                yield {"response": delta}
+
+            result["response"] = "".join(parts).strip()
+            await self.cache.set(key, result)
+            
+        except Exception as e:
+            logger.error(f"Error in processing audio: {str(e)}")
+            raise
+
+    async def aclose(self) -> None:
+        """Close the response cache's connections."""
+        await self.cache.aclose()
+
+    async def cached_result(self, audio_digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a finished pipeline result without decoding or transcribing anything.
+        
+        Args:
+            audio_digest (str): SHA-256 of the encoded audio
+            
+        Returns:
+            Dict containing all processing results, or None on a cache miss
+        """
+        cached = await self.cache.get("pipeline:" + audio_digest)
+        return dict(cached) if cached is not None else None
+
+    @staticmethod
+    def stream_events(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Split a finished result into the events process_audio_stream yields.
+        
+        Args:
+            result (Dict): A complete pipeline result
+            
+        Returns:
+            List with the classification event followed by the full response
+        """
+        return [
+            {field: value for field, value in result.items() if field != "response"},
+            {"response": result["response"]}
+        ]
+
+    async def _audio_digest(self, audio: AudioInput, audio_digest: Optional[str] = None) -> str:
+        if audio_digest is not None:
+            return audio_digest
+        if isinstance(audio, str):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, file_digest, audio)
+        if isinstance(audio, torch.Tensor):
+            audio = audio.cpu().numpy()
+        return hashlib.sha256(audio.tobytes()).hexdigest()
+
+    async def _transcribe(self, audio: AudioInput, audio_digest: str) -> Dict[str, Any]:
+        # The transcript is cached on its own so a failed GPT step never re-runs Whisper
+        key = "transcript:" + audio_digest
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        if isinstance(audio, str):
+            audio = await loop.run_in_executor(self.executor, self._load_audio_file, audio)
+
+        if len(audio) > whisper.audio.N_SAMPLES:
+            # Long clips need the full transcribe loop; keep them out of the batcher so
+            # they never hold up the short requests sharing a batch
+            transcription_result = await loop.run_in_executor(self.executor, self.transcribe_audio, audio)
+        else:
+            # Concurrent short uploads share a single batched Whisper pass
+            transcription_result = await self.batcher.submit(audio)
+        await self.cache.set(key, transcription_result)
+        return transcription_result